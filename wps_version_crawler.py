@@ -9,19 +9,30 @@ import re
 import shutil
 from datetime import datetime
 from bs4 import BeautifulSoup
-from typing import Dict, List, Optional, Tuple, Set
+from typing import Any, Dict, List, Optional, Tuple
 import logging
-from playwright.sync_api import sync_playwright, Route, Request
+from playwright.async_api import async_playwright, Browser, Playwright, Route, Request
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 from tqdm import tqdm
 import hashlib
-import time
+import functools
+import random
 import threading
-from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import aiohttp
 import asyncio
 from urllib.parse import urlparse
 
+try:
+    from yaml import CSafeDumper as SafeDumper, CSafeLoader as SafeLoader
+except ImportError:  # PyYAML 未编译 LibYAML 绑定时使用纯 Python 实现
+    from yaml import SafeDumper, SafeLoader
+
+try:
+    import orjson
+except ImportError:  # orjson 为可选依赖，未安装时使用标准库 json
+    orjson = None
+
 # 配置日志
 # 确保logs目录存在
 os.makedirs('logs', exist_ok=True)
@@ -36,6 +47,37 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# 版本解析用的正则表达式，模块加载时编译一次
+_WIN_VER_RE = re.compile(r'版本\s+(\d+\.\d+\.\d+\.(\d+))')
+_WIN_URL_RE = re.compile(r'WPS_Setup_(\d+)')
+_WIN_SETUP_RE = re.compile(r'WPS_Setup(_X64)?_(\d+)\.exe')
+_MAC_VERDATE_RE = re.compile(r'(\d+\.\d+\.\d+)/(\d+\.\d+\.\d+)')
+_MAC_VERBUILD_RE = re.compile(r'(\d+\.\d+\.\d+)\((\d+)\)')
+_MAC_VER_RE = re.compile(r'(\d+\.\d+\.\d+)')
+_DATE_RE = re.compile(r'[/\s](\d{4}\.\d{2}\.\d{2})')
+_CONTENT_RANGE_RE = re.compile(r'bytes \d+-\d+/(\d+)')
+_ZIP_RE = re.compile(r'wpscdn\.cn.*\.zip$')
+_DIR_RE = re.compile(r'wpscdn\.cn.*/$')
+
+# 解析页面不需要的资源类型，浏览器中直接拦截
+_BLOCKED_RESOURCE_TYPES = {"image", "font", "media", "stylesheet", "other"}
+
+# 每个页面最多记录的下载链接数量
+_MAX_CAPTURED_URLS = 2048
+
+def _write_at(fd: int, data, offset: int):
+    """将数据完整写入文件的指定偏移处"""
+    view = memoryview(data)
+    while view:
+        if hasattr(os, 'pwrite'):
+            written = os.pwrite(fd, view, offset)
+        else:
+            # Windows 没有 pwrite，退化为 lseek + write（分块任务都在同一线程中执行，不会交错）
+            os.lseek(fd, offset, os.SEEK_SET)
+            written = os.write(fd, view)
+        view = view[written:]
+        offset += written
+
 class Downloader:
     def __init__(self, num_threads=16, chunk_size=1024*1024*6):  # 16线程，4MB块大小
         self.num_threads = num_threads
@@ -57,43 +99,48 @@ class Downloader:
             'Connection': 'keep-alive',
             'Keep-Alive': 'timeout=60, max=1000'
         })
+        # 所有分块下载共用一个 aiohttp 会话，连接可跨文件复用
+        self._session: Optional[aiohttp.ClientSession] = None
 
-    def _download_chunk(self, url: str, start: int, end: int, file_path: str, pbar: tqdm) -> bool:
-        """下载文件块"""
-        headers = {
-            'Range': f'bytes={start}-{end}',
-            'Accept-Encoding': 'gzip, deflate, br',
-            'Connection': 'keep-alive'
-        }
-        max_retries = 3
-        retry_count = 0
-        
-        while retry_count < max_retries:
-            try:
-                response = self.session.get(url, headers=headers, stream=True, timeout=30)
-                if response.status_code in (200, 206):
-                    with open(file_path, 'rb+') as f:
-                        f.seek(start)
-                        for chunk in response.iter_content(chunk_size=16384):  # 增加读取块大小到16KB
-                            if chunk:
-                                f.write(chunk)
-                                pbar.update(len(chunk))
-                    return True
-            except Exception as e:
-                logger.warning(f"下载块 {start}-{end} 失败 (第 {retry_count + 1} 次): {str(e)}")
-                retry_count += 1
-                if retry_count < max_retries:
-                    time.sleep(0.5)  # 减少重试等待时间到0.5秒
-                    continue
-                logger.error(f"下载块 {start}-{end} 最终失败: {str(e)}")
-        return False
+    async def get_session(self) -> aiohttp.ClientSession:
+        """获取（必要时创建）共享的 aiohttp 会话"""
+        if self._session is None or self._session.closed:
+            timeout = aiohttp.ClientTimeout(total=300, connect=30)
+            # 连接池按并发分块数设置，保证所有分块都能复用已建立的长连接
+            conn = aiohttp.TCPConnector(
+                limit=self.num_threads * 2,
+                limit_per_host=self.num_threads,
+                ttl_dns_cache=300,
+                keepalive_timeout=60,
+                force_close=False,
+                enable_cleanup_closed=True
+            )
+            self._session = aiohttp.ClientSession(
+                timeout=timeout,
+                connector=conn,
+                headers={
+                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+                    'Accept': '*/*',
+                    'Accept-Encoding': 'gzip, deflate, br',
+                    'Connection': 'keep-alive'
+                }
+            )
+        return self._session
+
+    async def close(self):
+        """释放下载器持有的网络连接"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self.session.close()
 
     async def _async_download_chunk(self, session: aiohttp.ClientSession, url: str, start: int, end: int, 
-                                  file_path: str, pbar: tqdm) -> bool:
-        """异步下载文件块"""
+                                  fd: int, pbar: tqdm) -> Optional[memoryview]:
+        """异步下载文件块，成功时返回该块的数据"""
+        # 安装包本身已压缩，分块请求必须使用原始编码，否则偏移量没有意义
         headers = {
             'Range': f'bytes={start}-{end}',
-            'Accept-Encoding': 'gzip, deflate, br',
+            'Accept-Encoding': 'identity',
             'Connection': 'keep-alive'
         }
         max_retries = 3
@@ -103,13 +150,20 @@ class Downloader:
             try:
                 async with session.get(url, headers=headers, timeout=30) as response:
                     if response.status in (200, 206):
-                        with open(file_path, 'rb+') as f:
-                            f.seek(start)
-                            async for chunk in response.content.iter_chunked(16384):  # 增加读取块大小到16KB
-                                if chunk:
-                                    f.write(chunk)
-                                    pbar.update(len(chunk))
-                        return True
+                        # 先把整个分块读入预分配的缓冲区，再一次性按偏移量写入文件
+                        buf = bytearray(end - start + 1)
+                        mv = memoryview(buf)
+                        pos = 0
+                        async for chunk in response.content.iter_chunked(65536):  # 读取块大小64KB
+                            if chunk:
+                                mv[pos:pos + len(chunk)] = chunk
+                                pos += len(chunk)
+                        # 响应体提前结束时按失败处理，交给下面的重试逻辑
+                        if pos != len(buf):
+                            raise Exception(f"数据不完整: {pos}/{len(buf)}")
+                        _write_at(fd, mv, start)
+                        pbar.update(pos)
+                        return mv
             except Exception as e:
                 logger.warning(f"异步下载块 {start}-{end} 失败 (第 {retry_count + 1} 次): {str(e)}")
                 retry_count += 1
@@ -117,24 +171,33 @@ class Downloader:
                     await asyncio.sleep(0.5)  # 减少重试等待时间到0.5秒
                     continue
                 logger.error(f"异步下载块 {start}-{end} 最终失败: {str(e)}")
-        return False
+        return None
+
+    async def _probe_ranges(self, url: str) -> Tuple[bool, int]:
+        """请求第一个字节，确认服务器支持分块请求并获取文件总大小"""
+        session = await self.get_session()
+        headers = {'Range': 'bytes=0-0', 'Accept-Encoding': 'identity'}
+        async with session.get(url, headers=headers, allow_redirects=True) as response:
+            response.raise_for_status()
+            if response.status != 206:
+                return False, 0
+            # 以 Content-Range 中的总大小为准，HEAD 的 content-length 可能被 CDN 去掉或不一致
+            content_range = response.headers.get('Content-Range', '')
+            match = _CONTENT_RANGE_RE.match(content_range)
+            if not match:
+                logger.warning(f"无法解析 Content-Range: {content_range!r}")
+                return False, 0
+            return True, int(match.group(1))
 
-    def download_file(self, url: str, save_path: str) -> bool:
-        """使用多线程下载文件"""
+    async def download_file(self, url: str, save_path: str) -> Optional[str]:
+        """并发分块下载文件，下载过程中同步计算 SHA256，成功时返回哈希值，失败返回 None"""
         try:
-            # 获取文件大小
-            response = self.session.head(url, allow_redirects=True, timeout=30)
-            if response.status_code != 200:
-                return False
-            
-            total_size = int(response.headers.get('content-length', 0))
-            if total_size == 0:
-                # 如果无法获取文件大小，使用单线程下载
-                return self._download_single(url, save_path)
-            
-            # 创建空文件
-            with open(save_path, 'wb') as f:
-                f.truncate(total_size)
+            session = await self.get_session()
+            supports_ranges, total_size = await self._probe_ranges(url)
+            if not supports_ranges or total_size == 0:
+                # 服务器不支持分块请求或无法获取文件大小，在线程池中使用单线程下载
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(None, self._download_single, url, save_path)
             
             # 计算分块，确保每个块至少1MB
             min_chunk_size = 1024 * 1024  # 1MB
@@ -144,74 +207,33 @@ class Downloader:
                 end = min(start + chunk_size - 1, total_size - 1)
                 chunks.append((start, end))
             
-            # 使用进度条
-            with tqdm(
-                total=total_size,
-                unit='iB',
-                unit_scale=True,
-                desc=os.path.basename(save_path)
-            ) as pbar:
-                # 使用线程池并发下载
-                with ThreadPoolExecutor(max_workers=self.num_threads) as executor:
-                    futures = []
-                    for start, end in chunks:
-                        future = executor.submit(
-                            self._download_chunk, url, start, end, save_path, pbar
-                        )
-                        futures.append(future)
-                    
-                    # 等待所有下载完成
-                    results = [f.result() for f in futures]
-                    return all(results)
-                
-        except Exception as e:
-            logger.error(f"下载文件失败 {url}: {str(e)}")
-            if os.path.exists(save_path):
-                os.remove(save_path)
-            return False
-
-    async def _async_download_file(self, url: str, save_path: str) -> bool:
-        """异步下载文件"""
-        try:
-            # 配置 aiohttp 客户端会话
-            timeout = aiohttp.ClientTimeout(total=300, connect=30)
-            conn = aiohttp.TCPConnector(
-                limit=self.num_threads,
-                ttl_dns_cache=300,
-                force_close=False,
-                enable_cleanup_closed=True
-            )
+            # 限制同时驻留内存的分块数量：名额在分块送入哈希后才释放，
+            # 因此下载中和等待哈希的分块合计不超过 num_threads 个
+            sem = asyncio.Semaphore(self.num_threads)
             
-            async with aiohttp.ClientSession(
-                timeout=timeout,
-                connector=conn,
-                headers={
-                    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                    'Accept': '*/*',
-                    'Accept-Encoding': 'gzip, deflate, br',
-                    'Connection': 'keep-alive'
-                }
-            ) as session:
-                async with session.head(url) as response:
-                    if response.status != 200:
-                        return False
-                    total_size = int(response.headers.get('content-length', 0))
-                
-                if total_size == 0:
-                    # 如果无法获取文件大小，使用单线程下载
-                    return self._download_single(url, save_path)
-                
-                # 创建空文件
-                with open(save_path, 'wb') as f:
-                    f.truncate(total_size)
-                
-                # 计算分块，确保每个块至少1MB
-                min_chunk_size = 1024 * 1024  # 1MB
-                chunk_size = max(min_chunk_size, min(self.chunk_size, total_size // self.num_threads))
-                chunks = []
-                for start in range(0, total_size, chunk_size):
-                    end = min(start + chunk_size - 1, total_size - 1)
-                    chunks.append((start, end))
+            # 分块完成顺序不固定，先暂存乱序到达的块，按文件顺序依次送入哈希
+            sha256_hash = hashlib.sha256()
+            pending: Dict[int, memoryview] = {}
+            hashed_size = 0
+            
+            def feed_hash(start: int, data: memoryview):
+                nonlocal hashed_size
+                pending[start] = data
+                while hashed_size in pending:
+                    piece = pending.pop(hashed_size)
+                    sha256_hash.update(piece)
+                    hashed_size += len(piece)
+                    sem.release()
+            
+            # 只打开一次文件，所有任务通过 pwrite 写入各自的区间
+            flags = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_BINARY', 0)
+            fd = os.open(save_path, flags, 0o644)
+            try:
+                # 预先分配磁盘空间，避免稀疏文件在并发写入时频繁更新元数据
+                try:
+                    os.posix_fallocate(fd, 0, total_size)
+                except (AttributeError, OSError):
+                    os.ftruncate(fd, total_size)
                 
                 # 使用进度条
                 with tqdm(
@@ -220,30 +242,45 @@ class Downloader:
                     unit_scale=True,
                     desc=os.path.basename(save_path)
                 ) as pbar:
-                    # 并发下载所有块
-                    tasks = []
-                    for start, end in chunks:
-                        task = asyncio.create_task(
-                            self._async_download_chunk(session, url, start, end, save_path, pbar)
-                        )
-                        tasks.append(task)
+                    async def bounded_download(start: int, end: int):
+                        # 任务按文件顺序排队获取名额，最早未哈希的分块总能拿到名额，不会互相等待
+                        await sem.acquire()
+                        data = await self._async_download_chunk(session, url, start, end, fd, pbar)
+                        if data is None:
+                            raise Exception(f"分块 {start}-{end} 下载失败")
+                        feed_hash(start, data)
                     
-                    results = await asyncio.gather(*tasks)
-                    return all(results)
+                    # 并发下载所有块，任一分块失败时取消其余任务
+                    tasks = [asyncio.create_task(bounded_download(start, end)) for start, end in chunks]
+                    try:
+                        await asyncio.gather(*tasks)
+                    finally:
+                        for task in tasks:
+                            task.cancel()
+                        await asyncio.gather(*tasks, return_exceptions=True)
+            finally:
+                os.close(fd)
+            
+            if hashed_size != total_size:
+                raise Exception(f"分块下载不完整: {hashed_size}/{total_size}")
+            return sha256_hash.hexdigest()
                 
         except Exception as e:
             logger.error(f"异步下载文件失败 {url}: {str(e)}")
             if os.path.exists(save_path):
                 os.remove(save_path)
-            return False
+            return None
 
-    def _download_single(self, url: str, save_path: str) -> bool:
-        """单线程下载文件（用于无法获取文件大小的情况）"""
+    def _download_single(self, url: str, save_path: str) -> Optional[str]:
+        """单线程下载文件（用于无法获取文件大小的情况），成功时返回 SHA256 哈希值"""
         try:
-            response = self.session.get(url, stream=True, timeout=30)
+            # 请求未压缩的原始数据，直接从底层连接读取，跳过解码层
+            response = self.session.get(url, headers={'Accept-Encoding': 'identity'}, stream=True, timeout=30)
             response.raise_for_status()
+            response.raw.decode_content = False
             
             total_size = int(response.headers.get('content-length', 0))
+            sha256_hash = hashlib.sha256()
             with open(save_path, 'wb') as f, tqdm(
                 desc=os.path.basename(save_path),
                 total=total_size if total_size > 0 else None,
@@ -251,18 +288,27 @@ class Downloader:
                 unit_scale=True,
                 unit_divisor=1024,
             ) as pbar:
-                for chunk in response.iter_content(chunk_size=16384):  # 增加读取块大小到16KB
-                    if chunk:
-                        f.write(chunk)
-                        pbar.update(len(chunk))
-            return True
+                while True:
+                    chunk = response.raw.read(1024 * 1024)  # 每次读取1MB
+                    if not chunk:
+                        break
+                    f.write(chunk)
+                    sha256_hash.update(chunk)
+                    pbar.update(len(chunk))
+            return sha256_hash.hexdigest()
         except Exception as e:
             logger.error(f"单线程下载文件失败 {url}: {str(e)}")
             if os.path.exists(save_path):
                 os.remove(save_path)
-            return False
+            return None
 
 class WPSVersionCrawler:
+    # macOS 下载按钮选择器：优先匹配“立即下载”文字，其余 CSS 选择器合并为一次查询，XPath 作为备选
+    # 选择器列表按文档顺序匹配，因此“立即下载”需要单独查询，避免先匹配到导航栏中的下载链接
+    BUTTON_TEXT = ':text("立即下载")'
+    BUTTON_CSS = 'a[class*="download"], div[class*="download"] button'
+    BUTTON_XPATH = "//button[contains(text(), '下载')]"
+
     def __init__(self):
         self.windows_download_base_url = "https://official-package.wpscdn.cn/wps/download"
         self.mac_download_base_url = "https://package.mac.wpscdn.cn/mac_wps_pkg/wps_installer"
@@ -270,14 +316,18 @@ class WPSVersionCrawler:
         self.versions_dir = "versions"
         self.downloads_dir = "downloads"
         self.history_file = "version_history.json"
+        # YAML 解析结果缓存：路径 -> (修改时间, 数据)
+        self._yaml_cache: Dict[str, Tuple[int, Any]] = {}
         self._ensure_dirs()
         self._load_history()
         
         # 初始化下载器，使用更激进的设置
         self.downloader = Downloader(num_threads=16, chunk_size=1024*1024*4)  # 16线程，4MB块大小
         
-        # 存储捕获的下载链接
-        self.captured_urls: Set[str] = set()
+        # Windows 和 macOS 共用一个浏览器，每个平台使用独立的上下文
+        self._playwright: Optional[Playwright] = None
+        self._browser: Optional[Browser] = None
+        self._browser_lock: Optional[asyncio.Lock] = None
         
         # 平台特定的请求头
         self.platform_headers = {
@@ -298,74 +348,101 @@ class WPSVersionCrawler:
         }
 
     def _ensure_dirs(self):
-        """确保必要的目录存在"""
-        # 创建版本信息目录
-        if not os.path.exists(self.versions_dir):
-            os.makedirs(self.versions_dir)
-        
-        # 创建下载目录
-        if not os.path.exists(self.downloads_dir):
-            os.makedirs(self.downloads_dir)
-        
-        # 为每个平台创建子目录
+        """确保必要的目录存在（仅在初始化时调用一次）"""
+        # 为每个平台创建版本信息和下载子目录，父目录会一并创建
         for platform in ["windows", "macos"]:
-            # 版本信息子目录
-            platform_versions_dir = os.path.join(self.versions_dir, platform)
-            if not os.path.exists(platform_versions_dir):
-                os.makedirs(platform_versions_dir)
-            
-            # 下载子目录
-            platform_downloads_dir = os.path.join(self.downloads_dir, platform)
-            if not os.path.exists(platform_downloads_dir):
-                os.makedirs(platform_downloads_dir)
+            os.makedirs(os.path.join(self.versions_dir, platform), exist_ok=True)
+            os.makedirs(os.path.join(self.downloads_dir, platform), exist_ok=True)
+
+    def _load_yaml(self, path: str) -> Any:
+        """读取 YAML 文件，文件未修改时直接返回缓存的解析结果"""
+        mtime = os.stat(path).st_mtime_ns
+        cached = self._yaml_cache.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        with open(path, 'r', encoding='utf-8') as f:
+            data = yaml.load(f, Loader=SafeLoader)
+        self._yaml_cache[path] = (mtime, data)
+        return data
 
     def _load_history(self):
         """加载历史版本记录"""
         if os.path.exists(self.history_file):
             try:
-                with open(self.history_file, 'r', encoding='utf-8') as f:
-                    self.version_history = json.load(f)
+                if orjson is not None:
+                    with open(self.history_file, 'rb') as f:
+                        self.version_history = orjson.loads(f.read())
+                else:
+                    with open(self.history_file, 'r', encoding='utf-8') as f:
+                        self.version_history = json.load(f)
             except Exception as e:
                 logger.error(f"加载历史记录失败: {str(e)}")
                 self.version_history = {"windows": [], "macos": []}
         else:
             self.version_history = {"windows": [], "macos": []}
+        
+        # 按版本号建立索引，避免每次更新时线性查找
+        self._history_index: Dict[str, Dict[str, Dict]] = {
+            platform_key: {record.get("version"): record for record in records}
+            for platform_key, records in self.version_history.items()
+        }
 
     def _save_history(self):
         """保存历史版本记录"""
         try:
-            with open(self.history_file, 'w', encoding='utf-8') as f:
-                json.dump(self.version_history, f, ensure_ascii=False, indent=2)
+            if orjson is not None:
+                with open(self.history_file, 'wb') as f:
+                    f.write(orjson.dumps(
+                        self.version_history,
+                        option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+                    ))
+            else:
+                with open(self.history_file, 'w', encoding='utf-8') as f:
+                    json.dump(self.version_history, f, ensure_ascii=False, indent=2)
         except Exception as e:
             logger.error(f"保存历史记录失败: {str(e)}")
 
     def _update_history(self, platform: str, version_info: Dict):
         """更新历史版本记录"""
         platform_key = platform.lower()
-        if platform_key not in self.version_history:
-            self.version_history[platform_key] = []
+        records = self.version_history.setdefault(platform_key, [])
+        index = self._history_index.setdefault(platform_key, {})
         
         # 检查是否已存在该版本
-        for record in self.version_history[platform_key]:
-            if record.get("version") == version_info.get("version"):
-                # 更新现有记录
-                record.update(version_info)
-                break
+        record = index.get(version_info.get("version"))
+        if record is not None:
+            # 更新现有记录，更新时间不变时无需调整位置
+            old_time = record.get("update_time", "")
+            record.update(version_info)
+            if record.get("update_time", "") != old_time:
+                records.remove(record)
+                self._insert_by_update_time(records, record)
         else:
             # 添加新记录
-            self.version_history[platform_key].append(version_info)
-        
-        # 按更新时间排序
-        self.version_history[platform_key].sort(
-            key=lambda x: x.get("update_time", ""),
-            reverse=True
-        )
+            record = version_info
+            index[record.get("version")] = record
+            self._insert_by_update_time(records, record)
         
         self._save_history()
 
-    def _generate_filename(self, platform: str, version: str, build_number: Optional[str] = None, 
+    @staticmethod
+    def _insert_by_update_time(records: List[Dict], record: Dict):
+        """将记录二分插入到按更新时间降序排列的列表中"""
+        key = record.get("update_time", "")
+        lo, hi = 0, len(records)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if records[mid].get("update_time", "") >= key:
+                lo = mid + 1
+            else:
+                hi = mid
+        records.insert(lo, record)
+
+    @staticmethod
+    @functools.lru_cache(maxsize=128)
+    def _generate_filename(platform: str, version: str, build_number: Optional[str] = None, 
                           release_date: Optional[str] = None) -> str:
-        """生成标准化的文件名"""
+        """生成标准化的文件名（纯函数，结果可缓存）"""
         if platform.lower() == "windows":
             if release_date:
                 return f"WPS_Office_{version}_{release_date}.exe"
@@ -376,27 +453,79 @@ class WPSVersionCrawler:
             return f"WPS_Office_{version}_{build_number}.zip"
         return ""
 
-    def _calculate_file_hash(self, file_path: str) -> str:
-        """计算文件的 SHA256 哈希值"""
-        sha256_hash = hashlib.sha256()
-        with open(file_path, "rb") as f:
-            for byte_block in iter(lambda: f.read(4096), b""):
-                sha256_hash.update(byte_block)
-        return sha256_hash.hexdigest()
-
-    def _handle_route(self, route: Route, request: Request):
-        """处理网络请求，捕获下载链接"""
-        if any(ext in request.url for ext in ['.exe', '.zip']):
-            self.captured_urls.add(request.url)
-        route.continue_()
-
-    def _get_windows_version(self) -> Dict:
+    def _is_latest(self, local_info: Optional[Dict], version: str, build_number: Optional[str] = None) -> bool:
+        """判断本地记录的版本是否已是远程最新版本"""
+        if not local_info or local_info.get("version") != version:
+            return False
+        return build_number is None or local_info.get("build_number") == build_number
+
+    def load_version_info(self, platform: str) -> Optional[Dict]:
+        """读取平台的版本信息，JSON 副本严格比 YAML 新时才读取 JSON，否则以 YAML 为准"""
+        platform_key = platform.lower()
+        base = os.path.join(self.versions_dir, platform_key, platform_key)
+        try:
+            yaml_mtime = os.stat(base + ".yaml").st_mtime_ns
+        except FileNotFoundError:
+            yaml_mtime = None
+        try:
+            json_mtime = os.stat(base + ".json").st_mtime_ns
+        except FileNotFoundError:
+            json_mtime = None
+        
+        if json_mtime is not None and (yaml_mtime is None or json_mtime > yaml_mtime):
+            if orjson is not None:
+                with open(base + ".json", 'rb') as f:
+                    return orjson.loads(f.read())
+            with open(base + ".json", 'r', encoding='utf-8') as f:
+                return json.load(f)
+        if yaml_mtime is not None:
+            return self._load_yaml(base + ".yaml")
+        return None
+
+    @staticmethod
+    def _backoff(retry: int, initial: float = 1.0, growth: float = 2.0, max_delay: float = 30.0) -> float:
+        """计算第 retry 次重试前的等待时间（指数退避加随机抖动）"""
+        return min(initial * growth ** retry, max_delay) + random.uniform(0, 0.5)
+
+    async def _get_browser(self) -> Browser:
+        """获取共享的浏览器实例，首次使用时才启动"""
+        # 锁在首次使用时创建，检查与赋值之间没有 await，不会被并发任务重复创建
+        if self._browser_lock is None:
+            self._browser_lock = asyncio.Lock()
+        async with self._browser_lock:
+            if self._browser is None:
+                playwright = await async_playwright().start()
+                try:
+                    self._browser = await playwright.chromium.launch(timeout=60000, headless=True)
+                except Exception:
+                    # 启动失败时停止驱动进程，避免每次重试都遗留一个
+                    await playwright.stop()
+                    raise
+                self._playwright = playwright
+        return self._browser
+
+    async def _handle_route(self, route: Route, request: Request, captured_urls: Dict[str, None]):
+        """处理网络请求，捕获下载链接并拦截无关资源"""
+        # 只记录 CDN 上的安装包链接和目录链接，按首次出现的顺序去重，并限制数量
+        url = request.url
+        if ('wpscdn.cn' in url and (url.endswith('/') or any(ext in url for ext in ['.exe', '.zip']))
+                and url not in captured_urls and len(captured_urls) < _MAX_CAPTURED_URLS):
+            captured_urls[url] = None
+        if request.resource_type in _BLOCKED_RESOURCE_TYPES:
+            await route.abort()
+            return
+        await route.continue_()
+
+    async def _get_windows_version(self) -> Dict:
         """获取 Windows 版本信息"""
+        # 本次抓取的更新时间只计算一次，各分支复用
+        update_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         try:
             # 尝试获取最新版本
             latest_version = None
             download_url = None
             downloaded_file = None
+            file_hash = None
             release_date = None
             
             # 检查本地版本信息
@@ -404,83 +533,86 @@ class WPSVersionCrawler:
             local_info = None
             if os.path.exists(local_version_file):
                 try:
-                    with open(local_version_file, 'r', encoding='utf-8') as f:
-                        local_info = yaml.safe_load(f)
-                        if local_info and "version" in local_info:
-                            logger.info(f"本地已存在版本: {local_info['version']}")
+                    local_info = self._load_yaml(local_version_file)
+                    if local_info and "version" in local_info:
+                        logger.info(f"本地已存在版本: {local_info['version']}")
                 except Exception as e:
                     logger.warning(f"读取本地版本信息失败: {str(e)}")
             
             # 从360软件宝库获取最新版本号
             logger.info("从360软件宝库获取WPS最新版本信息")
             try:
-                headers = self.platform_headers["Windows"]
-                response = requests.get("https://baoku.360.cn/soft/show/appid/104693057", headers=headers, timeout=10)
-                if response.status_code == 200:
-                    # 使用正则表达式匹配版本号
-                    version_pattern = r'版本\s+(\d+\.\d+\.\d+\.(\d+))'
-                    match = re.search(version_pattern, response.text)
-                    if match:
-                        full_version = match.group(1)  # 完整版本号，如 12.1.0.21915
-                        latest_version = match.group(2)  # 提取版本号后缀，如 21915
-                        logger.info(f"从360软件宝库获取到WPS版本: {full_version}, 提取版本号: {latest_version}")
-                        
-                        # 优先尝试64位版本，再尝试32位版本
-                        bit_versions = ["X64_", ""]
-                        for bit_prefix in bit_versions:
-                            test_url = f"{self.windows_download_base_url}/WPS_Setup_{bit_prefix}{latest_version}.exe"
-                            if self._verify_download_url(test_url):
-                                download_url = test_url
-                                logger.info(f"验证下载链接成功: {download_url}")
-                                break
-                    else:
-                        logger.warning("未在360软件宝库页面找到WPS版本信息")
+                html = await self._fetch_text(
+                    "https://baoku.360.cn/soft/show/appid/104693057", self.platform_headers["Windows"]
+                )
+                # 使用正则表达式匹配版本号
+                match = _WIN_VER_RE.search(html)
+                if match:
+                    full_version = match.group(1)  # 完整版本号，如 12.1.0.21915
+                    latest_version = match.group(2)  # 提取版本号后缀，如 21915
+                    logger.info(f"从360软件宝库获取到WPS版本: {full_version}, 提取版本号: {latest_version}")
+                else:
+                    logger.warning("未在360软件宝库页面找到WPS版本信息")
             except Exception as e:
                 logger.error(f"从360软件宝库获取版本信息失败: {str(e)}")
             
-            # 如果从360软件宝库未获取到版本，尝试从中文官网获取
+            # 如果从360软件宝库未获取到版本，先尝试直接请求中文官网静态页面
             if not latest_version:
-                logger.info("从360软件宝库未获取到版本，尝试从中文官网获取")
+                logger.info("从360软件宝库未获取到版本，尝试从中文官网静态页面获取")
                 try:
-                    with sync_playwright() as p:
-                        browser = p.chromium.launch(headless=True)
-                        context = browser.new_context(
-                            viewport={'width': 1920, 'height': 1080},
-                            user_agent=self.platform_headers["Windows"]["User-Agent"]
-                        )
-                        
-                        page = context.new_page()
+                    html = await self._fetch_text("https://www.wps.cn/", self.platform_headers["Windows"])
+                    match = _WIN_SETUP_RE.search(html)
+                    if match:
+                        latest_version = match.group(2)
+                        logger.info(f"从中文官网静态页面获取到版本号: {latest_version}")
+                    else:
+                        logger.info("中文官网静态页面中未找到下载链接")
+                except Exception as e:
+                    logger.warning(f"请求中文官网静态页面失败: {str(e)}")
+            
+            # 静态页面中也没有版本信息时，才启动浏览器渲染中文官网
+            if not latest_version:
+                logger.info("尝试使用浏览器从中文官网获取")
+                try:
+                    browser = await self._get_browser()
+                    context = await browser.new_context(
+                        viewport={'width': 1920, 'height': 1080},
+                        user_agent=self.platform_headers["Windows"]["User-Agent"]
+                    )
+                    try:
+                        page = await context.new_page()
                         # 减少超时时间
                         page.set_default_timeout(15000)
                         page.set_default_navigation_timeout(30000)
                         
                         # 设置请求拦截
-                        self.captured_urls.clear()
-                        page.route("**/*", self._handle_route)
+                        captured_urls: Dict[str, None] = {}
+                        await page.route(
+                            "**/*",
+                            lambda route, request: self._handle_route(route, request, captured_urls)
+                        )
                         
                         # 访问中文官网
-                        response = page.goto("https://www.wps.cn/", wait_until="networkidle")
+                        response = await page.goto("https://www.wps.cn/", wait_until="domcontentloaded")
                         if response and response.status == 200:
-                            # 等待页面加载
-                            page.wait_for_load_state("domcontentloaded")
-                            page.wait_for_load_state("networkidle")
-                            
                             # 尝试点击下载按钮
                             try:
                                 download_button = page.locator("text=立即下载").first
+                                # 只等待下载按钮出现，不等待统计脚本等无关请求结束
+                                await download_button.wait_for(state="attached", timeout=5000)
                                 if download_button:
                                     logger.info("找到下载按钮，点击下载")
-                                    download_button.click()
-                                    page.wait_for_timeout(2000)  # 等待下载链接生成
+                                    await download_button.click()
+                                    await page.wait_for_timeout(2000)  # 等待下载链接生成
                                     
                                     # 从捕获的URL中查找下载链接
-                                    for url in self.captured_urls:
+                                    for url in captured_urls:
                                         if url.endswith('.exe') and 'wpscdn.cn' in url:
                                             download_url = url
                                             logger.info(f"找到下载链接: {url}")
                                             
                                             # 尝试从URL提取版本号
-                                            version_match = re.search(r'WPS_Setup_(\d+)', url)
+                                            version_match = _WIN_URL_RE.search(url)
                                             if version_match:
                                                 latest_version = version_match.group(1)
                                                 logger.info(f"从下载链接提取版本号: {latest_version}")
@@ -488,66 +620,43 @@ class WPSVersionCrawler:
                             except Exception as e:
                                 logger.warning(f"点击下载按钮失败: {str(e)}")
                         
-                        browser.close()
+                    finally:
+                        await context.close()
                 except Exception as e:
                     logger.warning(f"从中文官网获取版本失败: {str(e)}")
             
-            # 如果仍未获取到版本，使用已知的最新版本作为备选
-            if not latest_version:
-                logger.info("未能获取最新版本，使用已知的最新版本作为备选")
-                latest_version = "21915"  # 已知的最新版本
-                download_url = f"{self.windows_download_base_url}/WPS_Setup_{latest_version}.exe"
+            if latest_version:
+                # 版本未变化时直接复用本地记录，无需再验证下载链接
+                if self._is_latest(local_info, latest_version):
+                    logger.info(f"Windows 版本 {latest_version} 已是最新，跳过下载")
+                    return local_info
                 
-                # 验证下载链接是否有效
-                if not self._verify_download_url(download_url):
-                    # 尝试64位版本
-                    download_url = f"{self.windows_download_base_url}/WPS_Setup_X64_{latest_version}.exe"
-                    if not self._verify_download_url(download_url):
-                        logger.error("备选版本下载链接无效")
-                        return {
-                            "platform": "Windows",
-                            "version": "Unknown",
-                            "download_url": None,
-                            "update_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                            "error": "无法获取有效的下载链接"
-                        }
-                    
-                    # 检查版本是否需要更新
-                    if local_info and local_info.get("version") == latest_version:
-                        logger.info(f"Windows 版本 {latest_version} 已是最新，跳过下载")
-                        return local_info
-                    
-                    # 下载文件
-                    filename = self._generate_filename("Windows", latest_version, release_date=release_date)
-                    save_path = os.path.join(self.downloads_dir, "windows", filename)
-                    
-                    logger.info(f"发现新版本 {latest_version}，开始下载文件: {filename}")
-                    if self.downloader.download_file(url_64, save_path):
-                        logger.info(f"文件下载完成: {filename}")
-                        downloaded_file = save_path
-                elif self._verify_download_url(url_32):
-                    latest_version = str(version)
-                    download_url = url_32
-                    
-                    # 检查版本是否需要更新
-                    if local_info and local_info.get("version") == latest_version:
-                        logger.info(f"Windows 版本 {latest_version} 已是最新，跳过下载")
-                        return local_info
-                    
-                    # 下载文件
-                    filename = self._generate_filename("Windows", latest_version, release_date=release_date)
-                    save_path = os.path.join(self.downloads_dir, "windows", filename)
-                    
-                    logger.info(f"发现新版本 {latest_version}，开始下载文件: {filename}")
-                    if self.downloader.download_file(url_32, save_path):
-                        logger.info(f"文件下载完成: {filename}")
-                        downloaded_file = save_path
+                if not download_url:
+                    # 同时验证64位和32位链接，优先使用64位版本
+                    bit_versions = ["X64_", ""]
+                    download_url = await self._pick_first_valid([
+                        f"{self.windows_download_base_url}/WPS_Setup_{bit_prefix}{latest_version}.exe"
+                        for bit_prefix in bit_versions
+                    ])
+                    if download_url:
+                        logger.info(f"验证下载链接成功: {download_url}")
+            
+            # 未能获取到版本时不使用写死的旧版本，避免把旧版本记录为最新版本
+            if not latest_version:
+                logger.error("未能获取 Windows 最新版本")
+                return {
+                    "platform": "Windows",
+                    "version": "Unknown",
+                    "download_url": None,
+                    "update_time": update_time,
+                    "error": "无法获取最新版本"
+                }
             
             result = {
                 "platform": "Windows",
                 "version": latest_version or "Unknown",
                 "download_url": download_url,
-                "update_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                "update_time": update_time
             }
             
             if release_date:
@@ -555,7 +664,7 @@ class WPSVersionCrawler:
             
             if downloaded_file:
                 result["local_file"] = downloaded_file
-                result["file_hash"] = self._calculate_file_hash(downloaded_file)
+                result["file_hash"] = file_hash
             
             # 更新历史记录
             self._update_history("Windows", result)
@@ -567,12 +676,14 @@ class WPSVersionCrawler:
                 "platform": "Windows",
                 "version": "Unknown",
                 "download_url": None,
-                "update_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "update_time": update_time,
                 "error": str(e)
             }
 
-    def _get_macos_version(self) -> Dict:
+    async def _get_macos_version(self) -> Dict:
         """获取 macOS 版本信息"""
+        # 本次抓取的更新时间只计算一次，各分支复用
+        update_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         max_retries = 3
         retry_count = 0
         
@@ -581,48 +692,42 @@ class WPSVersionCrawler:
         local_info = None
         if os.path.exists(local_version_file):
             try:
-                with open(local_version_file, 'r', encoding='utf-8') as f:
-                    local_info = yaml.safe_load(f)
-                    if local_info and "version" in local_info:
-                        logger.info(f"本地已存在版本: {local_info['version']}")
+                local_info = self._load_yaml(local_version_file)
+                if local_info and "version" in local_info:
+                    logger.info(f"本地已存在版本: {local_info['version']}")
             except Exception as e:
                 logger.warning(f"读取本地版本信息失败: {str(e)}")
         
         while retry_count < max_retries:
             try:
-                with sync_playwright() as p:
-                    browser = p.chromium.launch(
-                        timeout=60000,
-                        headless=True
-                    )
-                    context = browser.new_context(
-                        viewport={'width': 1920, 'height': 1080},
-                        user_agent=self.platform_headers["macOS"]["User-Agent"]
-                    )
-                    
-                    page = context.new_page()
+                browser = await self._get_browser()
+                context = await browser.new_context(
+                    viewport={'width': 1920, 'height': 1080},
+                    user_agent=self.platform_headers["macOS"]["User-Agent"]
+                )
+                try:
+                    page = await context.new_page()
                     # 减少超时时间，避免资源浪费
                     page.set_default_timeout(15000)
                     page.set_default_navigation_timeout(30000)
                     
                     # 设置请求拦截
-                    self.captured_urls.clear()
-                    page.route("**/*", self._handle_route)
+                    captured_urls: Dict[str, None] = {}
+                    await page.route(
+                        "**/*",
+                        lambda route, request: self._handle_route(route, request, captured_urls)
+                    )
                     
                     logger.info(f"尝试获取 macOS 版本信息 (第 {retry_count + 1} 次)")
                     
                     # 访问页面
-                    response = page.goto(self.mac_url, wait_until="networkidle")
+                    response = await page.goto(self.mac_url, wait_until="domcontentloaded")
                     if not response:
                         raise Exception("页面加载失败")
                     
                     if response.status != 200:
                         raise Exception(f"页面返回状态码: {response.status}")
                     
-                    # 等待页面加载完成
-                    page.wait_for_load_state("domcontentloaded")
-                    page.wait_for_load_state("networkidle")
-                    
                     # 获取版本信息
                     logger.info("正在查找版本信息...")
                     
@@ -642,15 +747,21 @@ class WPSVersionCrawler:
                         "//div[contains(@class, 'download')]//span[contains(text(), '.')]"
                     ]
                     
+                    # 只等待版本信息出现，不等待统计脚本等无关请求结束
+                    try:
+                        await page.locator(selectors[0]).first.wait_for(state="attached", timeout=5000)
+                    except Exception as e:
+                        logger.warning(f"等待版本信息出现超时: {str(e)}")
+                    
                     for selector in selectors:
                         try:
                             element = page.locator(selector).first
                             if element:
-                                version_text = element.text_content().strip()
+                                version_text = (await element.text_content()).strip()
                                 logger.info(f"使用选择器 {selector} 找到版本信息: {version_text}")
                                 
                                 # 尝试从版本信息中提取日期
-                                date_match = re.search(r'[/\s](\d{4}\.\d{2}\.\d{2})', version_text)
+                                date_match = _DATE_RE.search(version_text)
                                 if date_match:
                                     release_date = date_match.group(1).replace('.', '-')
                                     logger.info(f"从版本信息中提取到发布日期: {release_date}")
@@ -662,7 +773,7 @@ class WPSVersionCrawler:
                     if version_text:
                         # 尝试多种版本号格式
                         # 尝试匹配 "12.1.21861/2025.06.20" 格式
-                        version_match = re.search(r'(\d+\.\d+\.\d+)\/(\d+\.\d+\.\d+)', version_text)
+                        version_match = _MAC_VERDATE_RE.search(version_text)
                         if version_match:
                             version = version_match.group(1)
                             release_date = version_match.group(2).replace('.', '-')
@@ -670,14 +781,14 @@ class WPSVersionCrawler:
                             logger.info(f"解析到版本号: {version}, 发布日期: {release_date}")
                         else:
                             # 尝试匹配 "7.5.1(8994)" 格式
-                            version_match = re.search(r'(\d+\.\d+\.\d+)\((\d+)\)', version_text)
+                            version_match = _MAC_VERBUILD_RE.search(version_text)
                             if version_match:
                                 version = version_match.group(1)
                                 build_number = version_match.group(2)
                                 logger.info(f"解析到版本号: {version}, 构建号: {build_number}")
                             else:
                                 # 尝试匹配任何版本号格式
-                                version_match = re.search(r'(\d+\.\d+\.\d+)', version_text)
+                                version_match = _MAC_VER_RE.search(version_text)
                                 if version_match:
                                     version = version_match.group(1)
                                     build_number = "0"  # 如果没有构建号，使用0
@@ -686,161 +797,262 @@ class WPSVersionCrawler:
                                     raise Exception(f"无法解析版本号: {version_text}")
                         
                         # 检查版本是否需要更新
-                        if local_info and local_info.get("version") == version and local_info.get("build_number") == build_number:
+                        if self._is_latest(local_info, version, build_number):
                             logger.info(f"macOS 版本 {version}({build_number}) 已是最新，跳过下载")
-                            browser.close()
                             return local_info
                         
-                        # 获取下载链接
-                        logger.info("正在查找下载按钮...")
-                        download_button = None
-                        button_selectors = [
-                            "text=立即下载",
-                            "//a[contains(@class, 'download')]",
-                            "//button[contains(text(), '下载')]",
-                            "//div[contains(@class, 'download')]//button"
-                        ]
-                        
-                        for selector in button_selectors:
-                            try:
-                                button = page.locator(selector).first
-                                if button:
-                                    download_button = button
-                                    logger.info(f"找到下载按钮: {selector}")
-                                    break
-                            except Exception as e:
-                                logger.warning(f"使用选择器 {selector} 查找下载按钮失败: {str(e)}")
-                                continue
-                        
-                        if download_button:
-                            # 点击下载按钮，触发下载链接生成
-                            logger.info("点击下载按钮...")
-                            download_button.click()
-                            page.wait_for_timeout(2000)
+                        # 安装包地址通常是固定的，先直接验证，无需点击按钮嗅探
+                        download_url = None
+                        installer_url = f"{self.mac_download_base_url}/WPS_Office_Installer.zip"
+                        url_ok, etag, content_length = await self._verify_download_url(installer_url)
+                        if url_ok:
+                            download_url = installer_url
+                            logger.info(f"直接使用已知下载链接: {download_url}")
+                        else:
+                            # 获取下载链接
+                            logger.info("已知下载链接无效，正在查找下载按钮...")
+                            download_button = None
+                            # 依次尝试“立即下载”文字、合并后的 CSS 选择器和 XPath
+                            for selector in (self.BUTTON_TEXT, self.BUTTON_CSS, self.BUTTON_XPATH):
+                                try:
+                                    button = page.locator(selector).first
+                                    if await button.count():
+                                        download_button = button
+                                        logger.info(f"找到下载按钮: {selector}")
+                                        break
+                                except Exception as e:
+                                    logger.warning(f"使用选择器 {selector} 查找下载按钮失败: {str(e)}")
+                                    continue
                             
-                                                            # 从捕获的URL中查找下载链接
-                            download_url = None
-                            for url in self.captured_urls:
+                            if download_button:
+                                # 点击下载按钮，等待安装包请求发出即返回，而不是固定等待
+                                # 安装包请求可能被路由拦截而没有响应，因此等待的是请求而非响应
+                                logger.info("点击下载按钮...")
+                                try:
+                                    async with page.expect_request(
+                                        lambda request: bool(_ZIP_RE.search(request.url)), timeout=8000
+                                    ) as request_info:
+                                        await download_button.click()
+                                    download_url = (await request_info.value).url
+                                    logger.info(f"找到下载链接: {download_url}")
+                                except PlaywrightTimeoutError:
+                                    logger.warning("等待下载请求超时，从已捕获的链接中查找")
+                                
+                                # 从捕获的URL中查找下载链接
                                 # 选择完整的安装包链接，而不是目录链接
-                                if url.endswith('.zip') and 'wpscdn.cn' in url:
-                                    download_url = url
-                                    logger.info(f"找到下载链接: {url}")
-                                    break
-                            
-                            if not download_url:
-                                # 如果没有找到完整的安装包链接，尝试使用目录链接
-                                for url in self.captured_urls:
-                                    if url.endswith('/') and 'wpscdn.cn' in url:
+                                if not download_url:
+                                    download_url = next((u for u in captured_urls if _ZIP_RE.search(u)), None)
+                                    if download_url:
+                                        logger.info(f"找到下载链接: {download_url}")
+                                if not download_url:
+                                    # 如果没有找到完整的安装包链接，尝试使用目录链接
+                                    dir_url = next((u for u in captured_urls if _DIR_RE.search(u)), None)
+                                    if dir_url:
                                         # 构建完整的下载链接
-                                        download_url = f"{url.rstrip('/')}/WPS_Office_Installer.zip"
+                                        download_url = f"{dir_url.rstrip('/')}/WPS_Office_Installer.zip"
                                         logger.info(f"构建下载链接: {download_url}")
-                                        break
-                            
-                            if download_url:
-                                # 下载文件
-                                filename = self._generate_filename("macOS", version, build_number, release_date)
-                                save_path = os.path.join(self.downloads_dir, "macos", filename)
                                 
+                                if download_url:
+                                    # 嗅探或拼接得到的链接需要确认可用，否则按未找到下载链接处理并重试
+                                    url_ok, etag, content_length = await self._verify_download_url(download_url)
+                                    if not url_ok:
+                                        logger.warning(f"下载链接无效: {download_url}")
+                                        download_url = None
+                            else:
+                                logger.warning("未找到下载按钮")
+                        
+                        if download_url:
+                            # 下载文件
+                            filename = self._generate_filename("macOS", version, build_number, release_date)
+                            save_path = os.path.join(self.downloads_dir, "macos", filename)
+                            
+                            # 安装包的 ETag 与本地记录一致时，说明文件内容未变，直接复用本地文件
+                            local_file = local_info.get("local_file") if local_info else None
+                            if (etag and local_info and local_info.get("etag") == etag and local_info.get("file_hash")
+                                    and local_file and os.path.exists(local_file)
+                                    and os.path.getsize(local_file) == content_length):
+                                logger.info(f"发现新版本 {version}({build_number})，但安装包未变化 (ETag {etag})，复用本地文件: {local_file}")
+                                # 文件名包含版本号，改名为新版本的文件名后再记录
+                                os.replace(local_file, save_path)
+                                file_hash = local_info["file_hash"]
+                            else:
                                 logger.info(f"发现新版本 {version}({build_number})，开始下载文件: {filename}")
-                                if self.downloader.download_file(download_url, save_path):
+                                file_hash = await self.downloader.download_file(download_url, save_path)
+                                if file_hash:
                                     logger.info(f"文件下载完成: {filename}")
-                                    downloaded = True
                                 else:
                                     logger.error(f"文件下载失败: {filename}")
-                                    downloaded = False
-                                
-                                result = {
-                                    "platform": "macOS",
-                                    "version": version,
-                                    "build_number": build_number,
-                                    "download_url": download_url,
-                                    "update_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                                }
-                                
-                                if release_date:
-                                    result["release_date"] = release_date
-                                
-                                if downloaded:
-                                    result["local_file"] = save_path
-                                    result["file_hash"] = self._calculate_file_hash(save_path)
-                                
-                                # 更新历史记录
-                                self._update_history("macOS", result)
-                                
-                                browser.close()
-                                return result
-                            else:
-                                logger.warning("未找到下载链接")
+                            
+                            result = {
+                                "platform": "macOS",
+                                "version": version,
+                                "build_number": build_number,
+                                "download_url": download_url,
+                                "update_time": update_time
+                            }
+                            
+                            if release_date:
+                                result["release_date"] = release_date
+                            
+                            if file_hash:
+                                result["local_file"] = save_path
+                                result["file_hash"] = file_hash
+                                if etag:
+                                    result["etag"] = etag
+                            
+                            # 更新历史记录
+                            self._update_history("macOS", result)
+                            
+                            return result
                         else:
-                            logger.warning("未找到下载按钮")
+                            logger.warning("未找到下载链接")
                     else:
                         logger.warning("未找到版本信息")
                     
-                    browser.close()
                     retry_count += 1
                     if retry_count < max_retries:
-                        logger.info(f"将在 5 秒后重试...")
-                        time.sleep(5)
+                        delay = self._backoff(retry_count - 1)
+                        logger.info(f"将在 {delay:.1f} 秒后重试...")
+                        await asyncio.sleep(delay)
                         continue
                     
                     return {
                         "platform": "macOS",
                         "version": "Unknown",
                         "download_url": None,
-                        "update_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                        "update_time": update_time,
                         "error": "无法获取版本信息或下载链接"
                     }
+                finally:
+                    await context.close()
                     
             except Exception as e:
                 logger.error(f"获取 macOS 版本信息失败 (第 {retry_count + 1} 次): {str(e)}")
                 retry_count += 1
                 if retry_count < max_retries:
-                    logger.info(f"将在 5 秒后重试...")
-                    time.sleep(5)
+                    delay = self._backoff(retry_count - 1)
+                    logger.info(f"将在 {delay:.1f} 秒后重试...")
+                    await asyncio.sleep(delay)
                     continue
                 
                 return {
                     "platform": "macOS",
                     "version": "Unknown",
                     "download_url": None,
-                    "update_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                    "update_time": update_time,
                     "error": str(e)
                 }
 
-    def _verify_download_url(self, url: str) -> bool:
-        """验证下载链接是否有效"""
+    async def _verify_download_url(self, url: str) -> Tuple[bool, Optional[str], int]:
+        """验证下载链接是否有效，返回 (是否有效, ETag, 文件大小)"""
         try:
-            response = requests.head(url, allow_redirects=True, timeout=5)
-            return response.status_code == 200
-        except:
-            return False
+            session = await self.downloader.get_session()
+            timeout = aiohttp.ClientTimeout(total=5)
+            async with session.head(url, allow_redirects=True, timeout=timeout) as response:
+                if response.status != 200:
+                    return False, None, 0
+                return True, response.headers.get('ETag'), int(response.headers.get('Content-Length', 0))
+        except Exception:
+            return False, None, 0
+
+    async def _fetch_text(self, url: str, headers: Dict[str, str]) -> str:
+        """使用共享会话获取页面文本"""
+        session = await self.downloader.get_session()
+        timeout = aiohttp.ClientTimeout(total=10)
+        async with session.get(url, headers=headers, timeout=timeout) as response:
+            response.raise_for_status()
+            return await response.text()
+
+    async def _pick_first_valid(self, urls: List[str]) -> Optional[str]:
+        """并发验证多个下载链接，按给定的优先顺序返回第一个有效链接"""
+        tasks = [asyncio.create_task(self._verify_download_url(url)) for url in urls]
+        try:
+            for url, task in zip(urls, tasks):
+                if (await task)[0]:
+                    return url
+            return None
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
 
     def save_version_info(self, platform: str, data: Dict):
-        """保存版本信息到 YAML 文件"""
+        """保存版本信息到 YAML 文件，并附带 JSON 副本"""
         platform_key = platform.lower()
         filename = os.path.join(self.versions_dir, platform_key, f"{platform_key}.yaml")
-        with open(filename, 'w', encoding='utf-8') as f:
-            yaml.dump(data, f, allow_unicode=True, sort_keys=False)
+        # 先写临时文件再原子替换，避免中途崩溃留下不完整的 YAML（目录已在初始化时创建）
+        tmp_file = filename + '.tmp'
+        try:
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                yaml.dump(data, f, Dumper=SafeDumper, allow_unicode=True, sort_keys=False)
+            os.replace(tmp_file, filename)
+        except Exception:
+            # 写入失败时删除临时文件，避免被工作流一并提交
+            if os.path.exists(tmp_file):
+                os.remove(tmp_file)
+            raise
+        # 同时原子写入 JSON 副本，供下游更快地读取
+        json_file = os.path.join(self.versions_dir, platform_key, f"{platform_key}.json")
+        tmp_file = json_file + '.tmp'
+        try:
+            if orjson is not None:
+                with open(tmp_file, 'wb') as f:
+                    f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+            else:
+                with open(tmp_file, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_file, json_file)
+        except Exception:
+            if os.path.exists(tmp_file):
+                os.remove(tmp_file)
+            raise
         logger.info(f"已保存 {platform} 版本信息到 {filename}")
 
     def crawl_all_versions(self):
         """抓取所有平台的版本信息"""
+        asyncio.run(self._crawl_all_versions())
+
+    async def _crawl_all_versions(self):
+        """并发抓取所有平台的版本信息"""
         platforms = {
             "Windows": self._get_windows_version,
             "macOS": self._get_macos_version
         }
+        
+        try:
+            for platform in platforms:
+                logger.info(f"开始抓取 {platform} 版本信息...")
+            results = await asyncio.gather(
+                *(crawler_func() for crawler_func in platforms.values()),
+                return_exceptions=True
+            )
+        finally:
+            await self.close()
 
-        for platform, crawler_func in platforms.items():
+        for platform, version_info in zip(platforms, results):
+            if isinstance(version_info, BaseException):
+                logger.error(f"抓取 {platform} 版本信息时发生错误: {str(version_info)}")
+                continue
             try:
-                logger.info(f"开始抓取 {platform} 版本信息...")
-                version_info = crawler_func()
                 # 确保版本信息有效再保存
                 if version_info and "version" in version_info and version_info["version"] != "Unknown":
                     self.save_version_info(platform, version_info)
                 else:
                     logger.error(f"{platform} 版本信息无效或获取失败，跳过保存")
             except Exception as e:
-                logger.error(f"抓取 {platform} 版本信息时发生错误: {str(e)}")
+                logger.error(f"保存 {platform} 版本信息时发生错误: {str(e)}")
+
+    async def close(self):
+        """释放爬虫持有的浏览器和网络连接"""
+        if self._browser is not None:
+            await self._browser.close()
+            self._browser = None
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+        # 锁绑定在当前事件循环上，下次运行时重新创建
+        self._browser_lock = None
+        await self.downloader.close()
 
 def main():
     crawler = WPSVersionCrawler()